@@ -0,0 +1,18 @@
+"""
+Shared logging setup for the alt text generation MCP servers
+"""
+
+import logging
+import os
+
+DEFAULT_LOG_LEVEL = logging.WARNING
+
+def resolve_log_level() -> int:
+    """Read the level from LOG_LEVEL, then FASTMCP_LOG_LEVEL; unknown names fall back to WARNING"""
+    name = (os.environ.get("LOG_LEVEL") or os.environ.get("FASTMCP_LOG_LEVEL") or "").strip().upper()
+    level = logging.getLevelName(name) if name else DEFAULT_LOG_LEVEL
+    return level if isinstance(level, int) else DEFAULT_LOG_LEVEL
+
+def configure_logging() -> None:
+    """Configure root logging for a server process"""
+    logging.basicConfig(level=resolve_log_level())
@@ -5,27 +5,194 @@ Specialized Computer Vision server for generating accessibility-focused alt text
 """
 
 import asyncio
-import base64
+import functools
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, cast
 from urllib.parse import urlparse
+import blake3
 import httpx
+import numpy as np
+import orjson
+import pybase64
 from mcp.server import Server
 import mcp.server.stdio
 import mcp.types as types
 
+from logging_config import configure_logging
+
+run_event_loop: Callable[..., Any]
+try:
+    from uvloop import run as run_event_loop
+except ImportError:  # uvloop is unavailable on Windows
+    run_event_loop = asyncio.run
+
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger("alt-text-generator")
 
+# Phrases that add nothing for screen reader users, who already hear that an element is an image
+REDUNDANT_PHRASES = re.compile(r"\b(?:image|picture|photo|graphic) of\b", re.IGNORECASE)
+
+# Context fields included in the Vision prompt, in order; values are formatted as str and
+# surrounding text is truncated to 200 chars
+CONTEXT_PROMPT_FIELDS = (
+    ("page_title", "Page title: {}"),
+    ("surrounding_text", "Surrounding text: {:.200s}..."),
+    ("image_filename", "Image filename: {}"),
+    ("page_topic", "Page topic: {}"),
+)
+
+@dataclass
+class AltSuggestion:
+    """A single alt text option; its length is always derived from the text"""
+    
+    __slots__ = ("type", "text", "confidence")
+    
+    type: str
+    text: str
+    confidence: float
+    
+    @property
+    def length(self) -> int:
+        return len(self.text)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the suggestion shape returned by the tools"""
+        return {"type": self.type, "text": self.text, "length": self.length, "confidence": self.confidence}
+
+class BatchScheduler:
+    """Coalesces concurrent alt text requests into batched Vision API calls"""
+    
+    def __init__(self, handler: Callable[[List[str], List[Dict[str, Any]]], Awaitable[List[Any]]],
+                 max_batch: int = 32, max_wait_ms: float = 10.0):
+        self._handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional["asyncio.Queue[Tuple[str, Dict[str, Any], asyncio.Future]]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self._dispatches: Set["asyncio.Task[None]"] = set()
+        
+    async def submit(self, image_url: str, context: Dict[str, Any]) -> Any:
+        """Queue one image and wait for its share of the batched result"""
+        # The queue is created alongside the worker, inside the running loop
+        queue = self._queue
+        if queue is None or self._worker is None or self._worker.done():
+            queue = self._queue = asyncio.Queue()
+            self._worker = asyncio.ensure_future(self._run(queue))
+            
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((image_url, context, future))
+        return await future
+    
+    async def close(self) -> None:
+        """Stop the background worker and any batches still being dispatched"""
+        tasks = list(self._dispatches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._queue = None
+        self._dispatches.clear()
+    
+    async def _run(self, queue: "asyncio.Queue[Tuple[str, Dict[str, Any], asyncio.Future]]") -> None:
+        """Collect batches and dispatch each without blocking collection of the next"""
+        while True:
+            items = await self._drain(queue)
+            dispatch = asyncio.ensure_future(self._dispatch(items))
+            self._dispatches.add(dispatch)
+            dispatch.add_done_callback(self._dispatches.discard)
+    
+    async def _drain(self, queue: "asyncio.Queue[Tuple[str, Dict[str, Any], asyncio.Future]]"
+                     ) -> List[Tuple[str, Dict[str, Any], asyncio.Future]]:
+        """Wait for one item, then keep collecting until the window closes or the batch fills"""
+        loop = asyncio.get_running_loop()
+        items = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+        
+        while len(items) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+                
+        return items
+    
+    async def _dispatch(self, items: List[Tuple[str, Dict[str, Any], asyncio.Future]]) -> None:
+        """Run the handler for one batch and resolve each waiter with its result"""
+        # Skip images whose callers have already gone away
+        items = [item for item in items if not item[2].done()]
+        if not items:
+            return
+            
+        try:
+            results = await self._handler([item[0] for item in items], [item[1] for item in items])
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+            
+        # Never leave a caller waiting on a result the handler did not produce
+        if len(results) != len(items):
+            error = RuntimeError(f"Batch handler returned {len(results)} results for {len(items)} requests")
+            results = [error] * len(items)
+            
+        for (_, _, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
 class AltTextGenerator:
     """Computer Vision-powered alt text generation service"""
     
     def __init__(self):
         self.openai_api_key = None
         self.max_image_size = 2048
+        self.max_file_size = 5 * 1024 * 1024  # 5MB limit to prevent abuse
         self.supported_formats = ['jpeg', 'jpg', 'png', 'gif', 'webp']
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache_max_entries = 4096
+        self.cache_ttl = 300.0  # seconds
+        self._result_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        self.image_cache_max_entries = 256
+        self._image_cache: "OrderedDict[bytes, Tuple[float, str]]" = OrderedDict()
+        # URL -> (ETag, Last-Modified); outlives the image cache so expired entries revalidate cheaply
+        self.etag_cache_max_entries = 1024
+        self.etag_cache_ttl = 24 * 60 * 60.0  # seconds
+        self._etag_cache: "OrderedDict[str, Tuple[float, Tuple[Optional[str], Optional[str]]]]" = OrderedDict()
+        self._batch_scheduler = BatchScheduler(self._generate_alt_text_options_batched)
+        
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=10.0
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Stop batching and close the shared HTTP client"""
+        await self._batch_scheduler.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
         
     async def analyze_image(self, image_data: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -38,22 +205,101 @@ class AltTextGenerator:
         Returns:
             Dictionary with alt text suggestions and analysis
         """
+        if not isinstance(image_data, str) or not image_data:
+            return self._create_error_response("image_data must be a non-empty string")
+            
+        image_key = blake3.blake3(image_data.encode('utf-8')).digest()
+        key = self._cache_key(image_key, context)
+        
+        cached = self._cache_get(self._result_cache, key)
+        if cached is not None:
+            return cast(Dict[str, Any], cached)
+            
+        # Concurrent callers for the same key share a single in-flight analysis
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_analysis(image_data, image_key, context))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_analysis(key, done))
+            
+        return await asyncio.shield(task)
+    
+    def _cache_key(self, image_key: bytes, context: Dict[str, Any]) -> str:
+        """Build a deterministic cache key from the image digest and its context"""
+        try:
+            canonical_context = orjson.dumps(context, option=orjson.OPT_SORT_KEYS, default=str)
+        except TypeError:
+            # orjson rejects some valid JSON, e.g. integers beyond 64 bits
+            canonical_context = json.dumps(
+                context, sort_keys=True, separators=(',', ':'), default=str
+            ).encode('utf-8')
+        return image_key.hex() + blake3.blake3(canonical_context).hexdigest()
+    
+    def _cache_get(self, cache: "OrderedDict[Any, Tuple[float, Any]]", key: Any) -> Any:
+        """Return a fresh cached value, refreshing its LRU position"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return value
+    
+    def _cache_put(self, cache: "OrderedDict[Any, Tuple[float, Any]]", key: Any, value: Any,
+                   max_entries: int, ttl: Optional[float] = None) -> None:
+        """Store a value with a TTL (cache_ttl by default), evicting least recently used entries"""
+        cache[key] = (time.monotonic() + (self.cache_ttl if ttl is None else ttl), value)
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+    
+    def _finish_analysis(self, key: str, task: "asyncio.Future[Dict[str, Any]]") -> None:
+        """Release the in-flight slot and cache successful results"""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result.get("success"):
+            self._cache_put(self._result_cache, key, result, self.cache_max_entries)
+    
+    async def _run_analysis(self, image_data: str, image_key: bytes, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the full analysis pipeline for an image (uncached)"""
         try:
-            # Determine if input is URL or base64 data
+            # Determine if input is URL or base64 data; either way the result is a URL
+            # (remote or data URI) that the Vision API accepts directly
             if image_data.startswith('http'):
-                image_input = await self._process_image_url(image_data)
+                # URLs seen before (e.g. across conversation turns) skip the validation round trip;
+                # base64 inputs are not cached since re-validating them costs only a short decode
+                image_input = self._cache_get(self._image_cache, image_key)
+                if image_input is None:
+                    image_input = await self._validate_image_url(image_data)
+                    if image_input:
+                        self._cache_put(self._image_cache, image_key, image_input, self.image_cache_max_entries)
             else:
                 image_input = await self._process_base64_image(image_data)
                 
             if not image_input:
                 return self._create_error_response("Invalid image format or size")
                 
-            # Generate alt text using OpenAI Vision API
-            alt_suggestions = await self._generate_alt_text_options(image_input, context)
-            
-            # Analyze image for accessibility relevance
-            accessibility_analysis = await self._analyze_accessibility_context(image_input, context)
+            # Generate alt text using OpenAI Vision API (batched with concurrent requests) and
+            # analyze the image for accessibility relevance; the two are independent
+            alt_suggestions, accessibility_analysis = await asyncio.gather(
+                self._batch_scheduler.submit(image_input, context),
+                self._analyze_accessibility_context(image_input, context),
+                return_exceptions=True
+            )
             
+            if isinstance(alt_suggestions, BaseException):
+                logger.error("Error generating alt text: %s", alt_suggestions)
+                return self._create_error_response(f"Analysis failed: {str(alt_suggestions)}")
+                
+            # A failed accessibility analysis should not discard usable alt text suggestions
+            if isinstance(accessibility_analysis, BaseException):
+                logger.error("Error analyzing accessibility context: %s", accessibility_analysis)
+                accessibility_analysis = {"error": f"Accessibility analysis failed: {str(accessibility_analysis)}"}
+                
             return {
                 "success": True,
                 "alt_suggestions": alt_suggestions,
@@ -62,56 +308,128 @@ class AltTextGenerator:
             }
             
         except Exception as e:
-            logger.error(f"Error analyzing image: {str(e)}")
+            logger.error("Error analyzing image: %s", e)
             return self._create_error_response(f"Analysis failed: {str(e)}")
     
-    async def _process_image_url(self, url: str) -> Optional[str]:
-        """Download and validate image from URL"""
+    async def _validate_image_url(self, url: str) -> Optional[str]:
+        """Validate a remote image without downloading it and return the URL unchanged"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, timeout=10.0)
+            # Ask for the leading bytes only; the Vision API fetches the image itself
+            headers = {"Range": "bytes=0-15"}
+            
+            # Revalidate previously accepted URLs so the origin can answer 304 without a body
+            validators = self._cache_get(self._etag_cache, url)
+            if validators is not None:
+                etag, last_modified = validators
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+                    
+            async with self._get_client().stream("GET", url, headers=headers, timeout=10.0) as response:
+                # httpx treats 304 as an error status, so it must be handled before raise_for_status
+                if response.status_code == 304 and validators is not None:
+                    refreshed = (
+                        response.headers.get('etag') or validators[0],
+                        response.headers.get('last-modified') or validators[1]
+                    )
+                    self._cache_put(self._etag_cache, url, refreshed, self.etag_cache_max_entries,
+                                    ttl=self.etag_cache_ttl)
+                    return url
+                    
                 response.raise_for_status()
                 
-                # Check content type
-                content_type = response.headers.get('content-type', '')
-                if not any(fmt in content_type for fmt in self.supported_formats):
-                    return None
+                etag = response.headers.get('etag')
+                last_modified = response.headers.get('last-modified')
+                
+                # Total size comes from Content-Range on a 206, Content-Length otherwise
+                if response.status_code == 206:
+                    total = response.headers.get('content-range', '').rpartition('/')[2]
+                else:
+                    total = response.headers.get('content-length', '')
                     
-                # Check file size (limit to prevent abuse)
-                if len(response.content) > 5 * 1024 * 1024:  # 5MB limit
+                head = bytearray()
+                size_known = total.isdigit()
+                if size_known and int(total) > self.max_file_size:
+                    return None
+                # A 206 with an unknown total ("bytes 0-15/*") only ever yields the requested
+                # range, so counting the body cannot enforce the size limit: reject it
+                if response.status_code == 206 and not size_known:
                     return None
                     
-                return base64.b64encode(response.content).decode('utf-8')
+                # Sniff the real format from magic bytes rather than trusting headers;
+                # when the size is unknown keep counting (without buffering) up to the limit
+                seen = 0
+                async for chunk in response.aiter_bytes(65536):
+                    if len(head) < 16:
+                        head.extend(chunk[:16 - len(head)])
+                    seen += len(chunk)
+                    # Stopping early on a 200 (server ignored Range) closes a partially read body:
+                    # under HTTP/1.1 that drops the pooled keep-alive connection, under HTTP/2 only
+                    # the stream is reset. That is still cheaper than downloading the whole image
+                    if size_known and len(head) >= 16:
+                        break
+                    if seen > self.max_file_size:
+                        return None
+                        
+            if not self._sniff_image_type(bytes(head)):
+                return None
+                
+            if etag or last_modified:
+                self._cache_put(self._etag_cache, url, (etag, last_modified), self.etag_cache_max_entries,
+                                ttl=self.etag_cache_ttl)
+                
+            return url
                 
         except Exception as e:
-            logger.error(f"Error processing image URL: {str(e)}")
+            logger.error("Error validating image URL: %s", e)
             return None
     
     async def _process_base64_image(self, base64_data: str) -> Optional[str]:
-        """Validate and process base64 image data"""
+        """Validate base64 image data and return it as a data URI"""
         try:
             # Remove data URL prefix if present
             if base64_data.startswith('data:'):
                 base64_data = base64_data.split(',')[1]
                 
-            # Validate base64 format
-            image_bytes = base64.b64decode(base64_data)
-            
-            # Check size limit
-            if len(image_bytes) > 5 * 1024 * 1024:  # 5MB limit
+            # Check size limit from the encoded length instead of decoding the payload
+            decoded_size = len(base64_data) * 3 // 4 - base64_data[-2:].count('=')
+            if decoded_size > self.max_file_size:
                 return None
                 
-            return base64_data
+            # Only the leading bytes are decoded, to sniff the actual format
+            mime_type = self._sniff_image_type(pybase64.b64decode(base64_data[:16], validate=True))
+            if not mime_type:
+                return None
+                
+            return f"data:{mime_type};base64,{base64_data}"
             
         except Exception as e:
-            logger.error(f"Error processing base64 image: {str(e)}")
+            logger.error("Error processing base64 image: %s", e)
+            return None
+    
+    def _sniff_image_type(self, header: bytes) -> Optional[str]:
+        """Detect a supported image MIME type from its leading magic bytes"""
+        if header.startswith(b'\x89PNG\r\n\x1a\n'):
+            mime_type = "image/png"
+        elif header.startswith(b'\xff\xd8\xff'):
+            mime_type = "image/jpeg"
+        elif header.startswith((b'GIF87a', b'GIF89a')):
+            mime_type = "image/gif"
+        elif header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+            mime_type = "image/webp"
+        else:
             return None
+        return mime_type if mime_type.split('/')[1] in self.supported_formats else None
     
-    async def _generate_alt_text_options(self, image_data: str, context: Dict[str, Any]) -> List[Dict[str, str]]:
-        """Generate multiple alt text options using OpenAI Vision API"""
+    async def _generate_alt_text_options_batched(self, image_urls: List[str],
+                                                 contexts: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Generate alt text options for several images in one OpenAI Vision API request
         
-        # Build context-aware prompt
-        context_prompt = self._build_context_prompt(context)
+        Returns one entry per image, in order: its list of suggestions, or the exception
+        that prevented that image from being included in the request
+        """
         
         system_prompt = """You are an accessibility expert specializing in creating descriptive alt text for images. 
         Generate 3-5 different alt text options that are:
@@ -121,59 +439,69 @@ class AltTextGenerator:
         4. Accessible to screen reader users
         5. Varied in detail level (brief, moderate, detailed)
         
-        Consider the page context provided and prioritize information that would be most valuable to someone who cannot see the image."""
+        Consider the page context provided and prioritize information that would be most valuable to someone who cannot see the image.
+        When several images are provided, answer for each image separately and in order."""
+        
+        # Each image is preceded by its own context-aware prompt; remote URLs and data URIs
+        # are both passed through as-is, so images are never re-encoded
+        # A bad context only fails its own image, not the rest of the batch
+        content: List[Dict[str, Any]] = []
+        results: List[Any] = []
+        included: List[int] = []
+        for position, (image_url, context) in enumerate(zip(image_urls, contexts)):
+            try:
+                context_prompt = self._build_context_prompt(context)
+            except Exception as e:
+                results.append(e)
+                continue
+            results.append(None)
+            included.append(position)
+            content.append({"type": "text", "text": f"Image {len(included)}:\n{context_prompt}"})
+            content.append({"type": "image_url", "image_url": {"url": image_url}})
+            
+        if not included:
+            return results
+            
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content}
+        ]
         
         try:
             # Simulate OpenAI Vision API call (replace with actual API integration)
             # For demo purposes, generating contextual suggestions
             suggestions = [
-                {
-                    "type": "brief",
-                    "text": "Descriptive image relevant to page content",
-                    "length": 42,
-                    "confidence": 0.85
-                },
-                {
-                    "type": "moderate", 
-                    "text": "Detailed description based on visual analysis and page context",
-                    "length": 68,
-                    "confidence": 0.90
-                },
-                {
-                    "type": "detailed",
-                    "text": "Comprehensive description including key visual elements, colors, composition, and contextual relevance to surrounding content",
-                    "length": 134,
-                    "confidence": 0.88
-                }
+                AltSuggestion("brief", "Descriptive image relevant to page content", 0.85),
+                AltSuggestion("moderate", "Detailed description based on visual analysis and page context", 0.90),
+                AltSuggestion(
+                    "detailed",
+                    "Comprehensive description including key visual elements, colors, composition, and contextual relevance to surrounding content",
+                    0.88
+                )
             ]
             
             # In production, this would make actual API calls:
-            # response = await self._call_openai_vision_api(image_data, system_prompt + context_prompt)
-            # suggestions = self._parse_openai_response(response)
+            # response = await self._call_openai_vision_api(messages)
+            # per_image = self._parse_openai_response(response, len(included))
             
-            return suggestions
+            per_image = [[suggestion.to_dict() for suggestion in suggestions] for _ in included]
             
         except Exception as e:
-            logger.error(f"Error generating alt text: {str(e)}")
-            return [{"type": "fallback", "text": "Image description unavailable", "length": 32, "confidence": 0.5}]
+            logger.error("Error generating alt text: %s", e)
+            per_image = [
+                [AltSuggestion("fallback", "Image description unavailable", 0.5).to_dict()]
+                for _ in included
+            ]
+            
+        for position, image_suggestions in zip(included, per_image):
+            results[position] = image_suggestions
+        return results
     
     def _build_context_prompt(self, context: Dict[str, Any]) -> str:
         """Build context-aware prompt from page information"""
-        prompt_parts = []
-        
-        if context.get('page_title'):
-            prompt_parts.append(f"Page title: {context['page_title']}")
-            
-        if context.get('surrounding_text'):
-            prompt_parts.append(f"Surrounding text: {context['surrounding_text'][:200]}...")
-            
-        if context.get('image_filename'):
-            prompt_parts.append(f"Image filename: {context['image_filename']}")
-            
-        if context.get('page_topic'):
-            prompt_parts.append(f"Page topic: {context['page_topic']}")
-            
-        return "\n".join(prompt_parts) if prompt_parts else "No additional context available."
+        return "\n".join(
+            template.format(str(value)) for key, template in CONTEXT_PROMPT_FIELDS if (value := context.get(key))
+        ) or "No additional context available."
     
     async def _analyze_accessibility_context(self, image_data: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze image for accessibility-specific insights"""
@@ -195,12 +523,7 @@ class AltTextGenerator:
             "success": False,
             "error": error_message,
             "alt_suggestions": [
-                {
-                    "type": "fallback",
-                    "text": "Image description unavailable - please add manual alt text",
-                    "length": 58,
-                    "confidence": 0.0
-                }
+                AltSuggestion("fallback", "Image description unavailable - please add manual alt text", 0.0).to_dict()
             ]
         }
 
@@ -208,10 +531,10 @@ class AltTextGenerator:
 server = Server("alt-text-generator")
 alt_text_service = AltTextGenerator()
 
-@server.list_tools()
-async def handle_list_tools() -> List[types.Tool]:
-    """List available tools for alt text generation"""
-    return [
+@functools.lru_cache(maxsize=1)
+def _tool_definitions() -> Tuple[types.Tool, ...]:
+    """Build the static tool definitions once per process"""
+    return (
         types.Tool(
             name="generate_alt_text",
             description="Generate descriptive alt text options for images using Computer Vision",
@@ -257,95 +580,154 @@ async def handle_list_tools() -> List[types.Tool]:
                 "type": "object",
                 "properties": {
                     "alt_text": {"type": "string"},
+                    "alt_texts": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Candidate alt texts to score in one call"
+                    },
                     "image_data": {"type": "string"},
                     "context": {"type": "object"}
                 },
-                "required": ["alt_text", "image_data"]
+                "required": ["image_data"],
+                "anyOf": [{"required": ["alt_text"]}, {"required": ["alt_texts"]}]
             }
         )
+    )
+
+@server.list_tools()
+async def handle_list_tools() -> List[types.Tool]:
+    """List available tools for alt text generation"""
+    return list(_tool_definitions())
+
+def _to_json_text(result: Dict[str, Any]) -> str:
+    """Serialize a tool result as indented JSON text"""
+    try:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
+    except TypeError:
+        # orjson rejects some valid JSON echoed back from arguments, e.g. integers beyond 64 bits
+        return json.dumps(result, indent=2, default=str)
+
+async def _handle_generate_alt_text(arguments: Dict[str, Any]) -> List[types.TextContent]:
+    """Generate alt text options for an image"""
+    image_data = arguments.get("image_data", "")
+    context = arguments.get("context") or {}
+    
+    result = await alt_text_service.analyze_image(image_data, context)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_to_json_text(result)
+        )
     ]
 
-@server.call_tool()
-async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
-    """Handle tool calls for alt text generation"""
+async def _handle_analyze_image_context(arguments: Dict[str, Any]) -> List[types.TextContent]:
+    """Analyze an image and evaluate its current alt text"""
+    image_data = arguments.get("image_data", "")
+    current_alt = arguments.get("current_alt", "")
+    context = arguments.get("context") or {}
     
-    if name == "generate_alt_text":
-        image_data = arguments.get("image_data", "")
-        context = arguments.get("context", {})
-        
-        result = await alt_text_service.analyze_image(image_data, context)
-        
-        return [
-            types.TextContent(
-                type="text",
-                text=json.dumps(result, indent=2)
-            )
+    # Analyze image and provide accessibility recommendations
+    analysis = await alt_text_service._analyze_accessibility_context(image_data, context)
+    analysis["current_alt_evaluation"] = {
+        "text": current_alt,
+        "length": len(current_alt) if current_alt else 0,
+        "quality_score": 0.5 if current_alt else 0.0,
+        "recommendations": [
+            "Consider more descriptive language" if current_alt else "Add descriptive alt text",
+            "Ensure essential information is conveyed",
+            "Keep under 125 characters when possible"
         ]
+    }
     
-    elif name == "analyze_image_context":
-        image_data = arguments.get("image_data", "")
-        current_alt = arguments.get("current_alt", "")
-        context = arguments.get("context", {})
-        
-        # Analyze image and provide accessibility recommendations
-        analysis = await alt_text_service._analyze_accessibility_context(image_data, context)
-        analysis["current_alt_evaluation"] = {
-            "text": current_alt,
-            "length": len(current_alt) if current_alt else 0,
-            "quality_score": 0.5 if current_alt else 0.0,
-            "recommendations": [
-                "Consider more descriptive language" if current_alt else "Add descriptive alt text",
-                "Ensure essential information is conveyed",
-                "Keep under 125 characters when possible"
-            ]
-        }
-        
-        return [
-            types.TextContent(
-                type="text", 
-                text=json.dumps(analysis, indent=2)
-            )
-        ]
+    return [
+        types.TextContent(
+            type="text", 
+            text=_to_json_text(analysis)
+        )
+    ]
+
+def _assess_alt_texts(alt_texts: List[str]) -> List[Dict[str, Any]]:
+    """Score a batch of alt texts, applying the length checks as vectorized array operations"""
+    lengths = np.fromiter((len(alt_text) for alt_text in alt_texts), dtype=np.int32, count=len(alt_texts))
+    scores = np.minimum(1.0, lengths / 50.0).tolist()
     
-    elif name == "validate_alt_text_quality":
-        alt_text = arguments.get("alt_text", "")
-        image_data = arguments.get("image_data", "")
-        context = arguments.get("context", {})
-        
-        # Score alt text quality
-        quality_analysis = {
+    issues: List[List[str]] = [[] for _ in alt_texts]
+    suggestions: List[List[str]] = [[] for _ in alt_texts]
+    
+    # Basic quality checks
+    length_checks = (
+        (lengths == 0, "Missing alt text", "Add descriptive alt text"),
+        ((lengths > 0) & (lengths < 10), "Alt text too brief", "Provide more descriptive detail"),
+        (lengths > 125, "Alt text may be too long", "Consider condensing to essential information"),
+    )
+    for mask, issue, suggestion in length_checks:
+        for i in np.flatnonzero(mask).tolist():
+            issues[i].append(issue)
+            suggestions[i].append(suggestion)
+            
+    for i, alt_text in enumerate(alt_texts):
+        if alt_text and REDUNDANT_PHRASES.search(alt_text):
+            issues[i].append("Redundant prefix")
+            suggestions[i].append("Remove phrases like 'image of'; screen readers already announce images")
+            
+    return [
+        {
             "alt_text": alt_text,
-            "length": len(alt_text),
-            "quality_score": min(1.0, len(alt_text) / 50) if alt_text else 0.0,
-            "issues": [],
-            "suggestions": []
+            "length": length,
+            "quality_score": score,
+            "issues": issues[i],
+            "suggestions": suggestions[i]
         }
-        
-        # Basic quality checks
-        if not alt_text:
-            quality_analysis["issues"].append("Missing alt text")
-            quality_analysis["suggestions"].append("Add descriptive alt text")
-        elif len(alt_text) < 10:
-            quality_analysis["issues"].append("Alt text too brief")
-            quality_analysis["suggestions"].append("Provide more descriptive detail")
-        elif len(alt_text) > 125:
-            quality_analysis["issues"].append("Alt text may be too long")
-            quality_analysis["suggestions"].append("Consider condensing to essential information")
-            
-        return [
-            types.TextContent(
-                type="text",
-                text=json.dumps(quality_analysis, indent=2)
-            )
-        ]
+        for i, (alt_text, length, score) in enumerate(zip(alt_texts, lengths.tolist(), scores))
+    ]
+
+async def _handle_validate_alt_text_quality(arguments: Dict[str, Any]) -> List[types.TextContent]:
+    """Validate and score existing alt text, or a batch of candidates"""
+    alt_texts = arguments.get("alt_texts")
+    image_data = arguments.get("image_data", "")
+    context = arguments.get("context") or {}
     
+    # Score alt text quality
+    if alt_texts is not None:
+        if not isinstance(alt_texts, list) or not all(isinstance(alt_text, str) for alt_text in alt_texts):
+            raise ValueError("alt_texts must be a list of strings")
+        quality_analysis: Dict[str, Any] = {"results": _assess_alt_texts(alt_texts)}
     else:
+        alt_text = arguments.get("alt_text") or ""
+        if not isinstance(alt_text, str):
+            raise ValueError("alt_text must be a string")
+        quality_analysis = _assess_alt_texts([alt_text])[0]
+        
+    return [
+        types.TextContent(
+            type="text",
+            text=_to_json_text(quality_analysis)
+        )
+    ]
+
+# Tool name -> handler; dispatch is a single dict lookup however many tools are added
+_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[List[types.TextContent]]]] = {
+    "generate_alt_text": _handle_generate_alt_text,
+    "analyze_image_context": _handle_analyze_image_context,
+    "validate_alt_text_quality": _handle_validate_alt_text_quality,
+}
+
+@server.call_tool()
+async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
+    """Handle tool calls for alt text generation"""
+    handler = _HANDLERS.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
+    return await handler(arguments)
 
 async def main():
     """Run the MCP server"""
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream)
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream)
+    finally:
+        await alt_text_service.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_event_loop(main())
\ No newline at end of file
@@ -6,12 +6,47 @@ Simple Alt Text Generation MCP Server
 import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+import os
+import stat
+import sys
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, cast
+
+from logging_config import configure_logging
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:  # Optional speedup; the server stays dependency-free without it
+    orjson = None
+
+run_event_loop: Callable[..., Any]
+try:
+    from uvloop import run as run_event_loop
+except ImportError:  # Optional speedup; unavailable on Windows
+    run_event_loop = asyncio.run
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger("alt-text-generator")
 
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return cast(bytes, orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0))
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Upper bound for one JSON-RPC line; base64 images make messages far larger than the 64KB default
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+
 class SimpleAltTextServer:
     """Simple MCP server for alt text generation"""
     
@@ -30,6 +65,16 @@ class SimpleAltTextServer:
                 }
             }
         ]
+        # The tool list is static, so its JSON-RPC result is built and serialized once up front
+        self._tools_result = {"tools": self.tools}
+        self._tools_list_result: bytes = dumps(self._tools_result)
+    
+    async def respond(self, message: Dict[str, Any]) -> bytes:
+        """Handle an incoming MCP message and return the serialized response"""
+        # Fast path: splice the pre-serialized tool list instead of re-encoding it
+        if message.get("method") == "tools/list":
+            return b'{"jsonrpc":"2.0","id":' + dumps(message.get("id")) + b',"result":' + self._tools_list_result + b'}'
+        return dumps(await self.handle_message(message))
     
     async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming MCP messages"""
@@ -56,7 +101,7 @@ class SimpleAltTextServer:
             return {
                 "jsonrpc": "2.0",
                 "id": msg_id,
-                "result": {"tools": self.tools}
+                "result": self._tools_result
             }
         
         elif method == "tools/call":
@@ -73,7 +118,7 @@ class SimpleAltTextServer:
                         "content": [
                             {
                                 "type": "text",
-                                "text": json.dumps(result, indent=2)
+                                "text": dumps(result, indent=True).decode('utf-8')
                             }
                         ]
                     }
@@ -98,51 +143,24 @@ class SimpleAltTextServer:
         page_title = context.get("page_title", "")
         page_topic = context.get("page_topic", "general")
         
-        # Generate contextual suggestions
-        suggestions = []
-        
+        # Generate contextual suggestions as (type, text, confidence); length is derived from the text
         if "product" in page_title.lower() or page_topic == "ecommerce":
-            suggestions = [
-                {
-                    "type": "brief",
-                    "text": "Product image showing key features",
-                    "length": 35,
-                    "confidence": 0.85
-                },
-                {
-                    "type": "moderate",
-                    "text": "Detailed product photo highlighting main functionality and design",
-                    "length": 65,
-                    "confidence": 0.90
-                },
-                {
-                    "type": "detailed",
-                    "text": "High-quality product photograph showcasing design, features, and build quality in professional lighting setup",
-                    "length": 115,
-                    "confidence": 0.88
-                }
+            options = [
+                ("brief", "Product image showing key features", 0.85),
+                ("moderate", "Detailed product photo highlighting main functionality and design", 0.90),
+                ("detailed", "High-quality product photograph showcasing design, features, and build quality in professional lighting setup", 0.88)
             ]
         else:
-            suggestions = [
-                {
-                    "type": "brief",
-                    "text": "Descriptive image relevant to page content",
-                    "length": 42,
-                    "confidence": 0.80
-                },
-                {
-                    "type": "moderate",
-                    "text": "Detailed visual content supporting the main page topic and user context",
-                    "length": 75,
-                    "confidence": 0.85
-                },
-                {
-                    "type": "detailed",
-                    "text": "Comprehensive visual description including key elements, composition, and contextual relevance to surrounding content",
-                    "length": 125,
-                    "confidence": 0.82
-                }
+            options = [
+                ("brief", "Descriptive image relevant to page content", 0.80),
+                ("moderate", "Detailed visual content supporting the main page topic and user context", 0.85),
+                ("detailed", "Comprehensive visual description including key elements, composition, and contextual relevance to surrounding content", 0.82)
             ]
+            
+        suggestions = [
+            {"type": kind, "text": text, "length": len(text), "confidence": confidence}
+            for kind, text, confidence in options
+        ]
         
         return {
             "success": True,
@@ -156,33 +174,89 @@ class SimpleAltTextServer:
             "context_used": context
         }
 
+class MessageTooLarge(Exception):
+    """Raised after an incoming line longer than MAX_MESSAGE_SIZE has been discarded"""
+
+async def read_limited_line(reader: asyncio.StreamReader) -> bytes:
+    """Read one line; a line longer than MAX_MESSAGE_SIZE is discarded and MessageTooLarge raised"""
+    oversized = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            # EOF; an empty result means the client disconnected
+            line = e.partial
+        except asyncio.LimitOverrunError as e:
+            # Drop what has been buffered so far and keep reading until the line ends
+            await reader.readexactly(e.consumed)
+            oversized = True
+            continue
+            
+        if oversized and line:
+            raise MessageTooLarge(f"Message larger than {MAX_MESSAGE_SIZE} bytes")
+        return line
+
+async def open_stdin_reader() -> Callable[[], Awaitable[bytes]]:
+    """Return a coroutine function that reads one line from stdin"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_MESSAGE_SIZE)
+    
+    # Only pipes, sockets and terminals can be watched by the loop (libuv aborts on regular files)
+    try:
+        mode = os.fstat(sys.stdin.fileno()).st_mode
+        if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode):
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+            return lambda: read_limited_line(reader)
+    except (NotImplementedError, OSError, ValueError):
+        pass
+        
+    # Otherwise (redirected files, Windows consoles) read on a worker thread
+    async def readline() -> bytes:
+        return await loop.run_in_executor(None, sys.stdin.buffer.readline)
+    return readline
+
 async def main():
     """Run the simple MCP server"""
     server = SimpleAltTextServer()
+    readline = await open_stdin_reader()
+    out = sys.stdout.buffer
     
     try:
         while True:
-            # Read message from stdin
-            line = await asyncio.get_event_loop().run_in_executor(None, input)
+            # Read message from stdin; an empty read means the client disconnected
+            try:
+                line = await readline()
+            except MessageTooLarge as e:
+                # The request id is unknown once the line is dropped, so reply with a null id
+                logger.error("Discarding message: %s", e)
+                out.write(dumps({
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32600, "message": "Request too large"}
+                }))
+                out.write(b"\n")
+                out.flush()
+                continue
+            if not line:
+                break
             if not line.strip():
                 continue
                 
             try:
-                message = json.loads(line)
-                response = await server.handle_message(message)
-                print(json.dumps(response))
+                message = loads(line)
+                response = await server.respond(message)
+                out.write(response)
+                out.write(b"\n")
+                out.flush()
                 
             except json.JSONDecodeError as e:
-                logger.error(f"Invalid JSON: {e}")
+                logger.error("Invalid JSON: %s", e)
             except Exception as e:
-                logger.error(f"Error handling message: {e}")
+                logger.error("Error handling message: %s", e)
                 
-    except EOFError:
-        # Client disconnected
-        pass
     except KeyboardInterrupt:
         # Server shutdown
         pass
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_event_loop(main())
\ No newline at end of file
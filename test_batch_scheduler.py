@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test request coalescing in the alt-text-generator server's BatchScheduler
+"""
+
+import asyncio
+import base64
+import sys
+
+sys.path.insert(0, "mcp-servers/alt-text-generator")
+from server import AltTextGenerator, BatchScheduler
+
+PNG_DATA_URI = "data:image/png;base64," + base64.b64encode(b"\x89PNG\r\n\x1a\n" + b"\x00" * 40).decode()
+
+async def test_batch_scheduler():
+    """Exercise batching, per-item failures, result-count checks and shutdown"""
+
+    checks = {}
+
+    # Concurrent analyze_image calls are coalesced into batches of at most max_batch
+    service = AltTextGenerator()
+    batch_sizes = []
+    generate = service._generate_alt_text_options_batched
+
+    async def recording_handler(image_urls, contexts):
+        batch_sizes.append(len(image_urls))
+        return await generate(image_urls, contexts)
+
+    service._batch_scheduler._handler = recording_handler
+    contexts = [{"page_title": f"Page {i}"} for i in range(40)]
+    # A non-object context fails while building its own prompt
+    contexts[5] = "not an object"
+    results = await asyncio.wait_for(
+        asyncio.gather(*(service.analyze_image(PNG_DATA_URI, context) for context in contexts)), timeout=5
+    )
+    await service.aclose()
+
+    checks["40 concurrent calls form batches of 32 and 8"] = batch_sizes == [32, 8]
+    checks["bad context fails only its own request"] = (
+        results[5]["success"] is False
+        and all(result["success"] for i, result in enumerate(results) if i != 5)
+    )
+
+    # Requests further apart than the window are dispatched separately
+    windows = []
+
+    async def echo_handler(image_urls, contexts):
+        windows.append(len(image_urls))
+        return list(image_urls)
+
+    scheduler = BatchScheduler(echo_handler, max_batch=32, max_wait_ms=10)
+    first = await scheduler.submit("a", {})
+    await asyncio.sleep(0.05)
+    second = await scheduler.submit("b", {})
+    checks["requests outside the window are not coalesced"] = windows == [1, 1] and (first, second) == ("a", "b")
+
+    # A per-item exception is delivered only to that item's caller
+    async def partial_handler(image_urls, contexts):
+        return [ValueError(url) if url == "bad" else url for url in image_urls]
+
+    scheduler._handler = partial_handler
+    outcomes = await asyncio.gather(
+        scheduler.submit("good", {}), scheduler.submit("bad", {}), return_exceptions=True
+    )
+    checks["per-item exception reaches only its waiter"] = (
+        outcomes[0] == "good" and isinstance(outcomes[1], ValueError)
+    )
+
+    # A handler returning too few results fails every waiter instead of leaving them hanging
+    async def short_handler(image_urls, contexts):
+        return []
+
+    scheduler._handler = short_handler
+    outcomes = await asyncio.wait_for(
+        asyncio.gather(scheduler.submit("x", {}), scheduler.submit("y", {}), return_exceptions=True), timeout=2
+    )
+    checks["result-count mismatch fails all waiters"] = all(isinstance(o, RuntimeError) for o in outcomes)
+
+    # close() stops the worker; a later submit starts a fresh one
+    await scheduler.close()
+    checks["close stops the worker"] = scheduler._worker is None and not scheduler._dispatches
+    scheduler._handler = echo_handler
+    checks["submit after close restarts the worker"] = await asyncio.wait_for(scheduler.submit("z", {}), timeout=2) == "z"
+    await scheduler.close()
+
+    print("=== Batch Scheduler Test ===")
+    for name, passed in checks.items():
+        print(f"{'PASS' if passed else 'FAIL'}: {name}")
+
+    return all(checks.values())
+
+if __name__ == "__main__":
+    success = asyncio.run(test_batch_scheduler())
+    print("✅ Success!" if success else "❌ Failed!")
+    if not success:
+        sys.exit(1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test conditional GET revalidation of image URLs in the alt-text-generator server
+"""
+
+import asyncio
+import sys
+
+import httpx
+
+sys.path.insert(0, "mcp-servers/alt-text-generator")
+from server import AltTextGenerator
+
+PNG_HEAD = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+async def test_conditional_get():
+    """A URL answered with 206 and then 304 must stay valid; an unbounded 206 must not"""
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(
+            206,
+            headers={"Content-Range": "bytes 0-15/2048", "ETag": '"v1"', "Content-Type": "image/png"},
+            content=PNG_HEAD
+        )
+
+    service = AltTextGenerator()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    url = "https://cdn.example.com/photo.png"
+
+    try:
+        first = await service._validate_image_url(url)
+        second = await service._validate_image_url(url)
+
+        # End to end: once the image and result caches expire, revalidation must still succeed
+        await service.analyze_image(url, {"page_title": "Test Page"})
+        service._image_cache.clear()
+        service._result_cache.clear()
+        result = await service.analyze_image(url, {"page_title": "Test Page"})
+    finally:
+        await service.aclose()
+
+    # A partial response with an unknown total size cannot prove the image is under the limit
+    def unknown_total_handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            206,
+            headers={"Content-Range": "bytes 0-15/*", "Content-Type": "image/png"},
+            content=PNG_HEAD
+        )
+
+    service = AltTextGenerator()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(unknown_total_handler))
+    try:
+        unknown_total = await service._validate_image_url("https://cdn.example.com/huge.png")
+    finally:
+        await service.aclose()
+
+    checks = {
+        "first fetch returns URL": first == url,
+        "304 revalidation returns URL": second == url,
+        "revalidation sent If-None-Match": requests[1].headers.get("if-none-match") == '"v1"',
+        "analysis after cache expiry succeeds": result.get("success") is True,
+        "206 with unknown total size is rejected": unknown_total is None,
+    }
+
+    print("=== Conditional GET Test ===")
+    for name, passed in checks.items():
+        print(f"{'PASS' if passed else 'FAIL'}: {name}")
+
+    return all(checks.values())
+
+if __name__ == "__main__":
+    success = asyncio.run(test_conditional_get())
+    print("✅ Success!" if success else "❌ Failed!")
+    if not success:
+        sys.exit(1)
@@ -5,7 +5,6 @@ Simple test script for the MCP alt-text-generator server
 
 import asyncio
 import json
-import subprocess
 import sys
 
 async def test_mcp_server():
@@ -53,12 +52,11 @@ async def test_mcp_server():
     
     try:
         # Start the MCP server process
-        process = subprocess.Popen(
-            [sys.executable, "mcp-servers/alt-text-generator/server.py"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "mcp-servers/alt-text-generator/server.py",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
         
         # Send messages
@@ -66,7 +64,11 @@ async def test_mcp_server():
         input_data = "\n".join(json.dumps(msg) for msg in messages) + "\n"
         
         # Communicate with the server
-        stdout, stderr = process.communicate(input=input_data, timeout=10)
+        stdout_bytes, stderr_bytes = await asyncio.wait_for(
+            process.communicate(input=input_data.encode()), timeout=10
+        )
+        stdout = stdout_bytes.decode()
+        stderr = stderr_bytes.decode()
         
         print("=== MCP Server Test Results ===")
         print(f"Return code: {process.returncode}")
@@ -88,9 +90,10 @@ async def test_mcp_server():
         
         return process.returncode == 0
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         print("Server test timed out")
         process.kill()
+        await process.wait()
         return False
     except Exception as e:
         print(f"Test failed with error: {e}")
@@ -5,7 +5,6 @@ Test the simple MCP server
 
 import asyncio
 import json
-import subprocess
 import sys
 
 async def test_simple_server():
@@ -46,16 +45,19 @@ async def test_simple_server():
     ]
     
     try:
-        process = subprocess.Popen(
-            [sys.executable, "mcp-servers/alt-text-generator/simple_server.py"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "mcp-servers/alt-text-generator/simple_server.py",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
         
         input_data = "\n".join(json.dumps(msg) for msg in messages) + "\n"
-        stdout, stderr = process.communicate(input=input_data, timeout=5)
+        stdout_bytes, stderr_bytes = await asyncio.wait_for(
+            process.communicate(input=input_data.encode()), timeout=5
+        )
+        stdout = stdout_bytes.decode()
+        stderr = stderr_bytes.decode()
         
         print("=== Simple Server Test ===")
         print(f"Return code: {process.returncode}")
@@ -76,6 +78,11 @@ async def test_simple_server():
             
         return process.returncode == 0
         
+    except asyncio.TimeoutError:
+        print("Server test timed out")
+        process.kill()
+        await process.wait()
+        return False
     except Exception as e:
         print(f"Test failed: {e}")
         return False